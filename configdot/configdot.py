@@ -5,11 +5,53 @@ Definitions for nested config objects.
 
 @author: Jussi (jnu@iki.fi)
 """
+import copy
 import pprint
 import logging
 
 logger = logging.getLogger(__name__)
 
+# sentinel for dict lookups of missing items
+_MISSING = object()
+
+_pformat = pprint.pformat
+# default line width of pprint.pformat()
+_PFORMAT_WIDTH = 80
+_SCALAR_TYPES = (int, float, bool, str, type(None))
+# types of values that can be shared between configs without copying
+_IMMUTABLE_TYPES = (int, float, complex, str, bytes, bool, type(None))
+
+
+def _copy_literal(val, memo=None):
+    """Deep copy an item value.
+
+    A faster version of copy.deepcopy() for the few types that literals can
+    evaluate to. Other types are copied by copy.deepcopy(). If memo is given,
+    it is used like the memo dict of copy.deepcopy(), so that shared and
+    self-referencing values are copied correctly.
+    """
+    val_type = type(val)
+    if val_type in _IMMUTABLE_TYPES:
+        return val
+    if memo is None:
+        memo = dict()
+    elif (new := memo.get(id(val), _MISSING)) is not _MISSING:
+        return new
+    if val_type is list:
+        # register the copy before copying the elements, to handle cycles
+        new = memo[id(val)] = list()
+        new.extend([_copy_literal(v, memo) for v in val])
+    elif val_type is dict:
+        new = memo[id(val)] = dict()
+        new.update({k: _copy_literal(v, memo) for k, v in val.items()})
+    elif val_type is tuple:
+        new = memo[id(val)] = tuple(_copy_literal(v, memo) for v in val)
+    elif val_type is set:
+        new = memo[id(val)] = set(val)
+    else:
+        new = copy.deepcopy(val, memo)
+    return new
+
 
 class ConfigItem:
     """A configuration item.
@@ -17,10 +59,12 @@ class ConfigItem:
     Stores name, comment and a value which may be of any Python type.
     """
 
+    __slots__ = ('name', 'value', '_comment')
+
     def __init__(self, name, value=None, comment=None):
         if not isinstance(name, str):
             raise ValueError('the item name must be a string')
-        self._comment = '' if comment is None else comment
+        self._comment = comment or ''
         self.name = name
         self.value = value
 
@@ -30,6 +74,15 @@ class ConfigItem:
     def __eq__(self, other):
         return self.value == other.value and self._comment == other._comment
 
+    def __deepcopy__(self, memo):
+        # the generic deepcopy machinery is slow for the many small objects of
+        # a config, so build the copy directly
+        new = memo[id(self)] = object.__new__(type(self))
+        new.name = self.name
+        new.value = _copy_literal(self.value, memo)
+        new._comment = self._comment
+        return new
+
     @property
     def literal_value(self):
         """Returns a string that is supposed to evaluate to the value"""
@@ -38,7 +91,14 @@ class ConfigItem:
     @property
     def item_def(self):
         """Prettyprint item definition"""
-        return f'{self.name} = {pprint.pformat(self.value)}'
+        value = self.value
+        # pformat() output equals repr() for scalars, except that strings
+        # longer than the line width are wrapped; skip pformat() when possible
+        if type(value) in _SCALAR_TYPES:
+            value_repr = repr(value)
+            if type(value) is not str or len(value_repr) <= _PFORMAT_WIDTH:
+                return f'{self.name} = {value_repr}'
+        return f'{self.name} = {_pformat(value)}'
 
 
 class ConfigContainer:
@@ -57,14 +117,13 @@ class ConfigContainer:
         An optional comment for the container.
     """
 
+    __slots__ = ('_items', '_comment')
+
     def __init__(self, comment=None):
-        if comment is None:
-            comment = ''
-        # modifying attributes of self would invoke __setattr__ which is
-        # reimplemented below, thus to modify them directly we need to do it via
-        # self.__dict__
-        self.__dict__['_items'] = dict()
-        self.__dict__['_comment'] = comment
+        # assigning to attributes of self would invoke __setattr__ which is
+        # reimplemented below, thus the slots need to be set via object
+        object.__setattr__(self, '_items', dict())
+        object.__setattr__(self, '_comment', comment or '')
 
     def __contains__(self, item):
         """Check items by name"""
@@ -72,23 +131,54 @@ class ConfigContainer:
 
     def __iter__(self):
         """Yields tuples of (item_name, item)"""
-        for val in self._items.items():
-            yield val
+        return iter(self._items.items())
 
     def __eq__(self, other):
         return self._items == other._items and self._comment == other._comment
 
+    def __getstate__(self):
+        return self._items, self._comment
+
+    def __setstate__(self, state):
+        # the default implementation would set the slots via __setattr__
+        items, comment = state
+        object.__setattr__(self, '_items', items)
+        object.__setattr__(self, '_comment', comment)
+
+    def __deepcopy__(self, memo):
+        # see ConfigItem.__deepcopy__
+        new = memo[id(self)] = object.__new__(type(self))
+        object.__setattr__(new, '_comment', self._comment)
+        items = dict()
+        object.__setattr__(new, '_items', items)
+        for name, item in self._items.items():
+            # items may also be referenced elsewhere in the copied object
+            if (item_copy := memo.get(id(item), _MISSING)) is _MISSING:
+                item_copy = item.__deepcopy__(memo)
+            items[name] = item_copy
+        return new
+
     def __getattr__(self, attr):
         """Returns an item by the syntax container.item.
 
         If the item is a ConfigItem instance, return the item value instead.
         This allows getting values directly by the syntax section.item.
         """
-        try:
-            item = self._items[attr]
-        except KeyError:
+        # copy/pickle probes may hit an instance whose slots are not yet set;
+        # don't recurse into self._items in that case
+        if attr == '_items':
+            raise AttributeError(attr)
+        item = self._items.get(attr, _MISSING)
+        if item is _MISSING:
+            # special attributes are probed often (e.g. by copy and pickle), so
+            # don't spend time on formatting an error message for them
+            if attr.startswith('__'):
+                raise AttributeError
             raise AttributeError(f"no such item or section: '{attr}'")
-        return item.value if isinstance(item, ConfigItem) else item
+        # check the exact type first, since it is faster than isinstance()
+        if type(item) is ConfigItem or isinstance(item, ConfigItem):
+            return item.value
+        return item
 
     def __getitem__(self, item):
         """Returns an item"""
@@ -100,42 +190,47 @@ class ConfigContainer:
 
     def __setattr__(self, attr, value):
         """Set attribute"""
-        if isinstance(value, ConfigItem):
+        # this is on the hot path of the parser, so check the exact types before
+        # falling back to isinstance() for subclasses, and do a single dict
+        # lookup for existing items
+        value_type = type(value)
+        if value_type is ConfigItem or (
+            value_type is not ConfigContainer and isinstance(value, ConfigItem)
+        ):
             if value.name != attr:
                 raise ValueError(
                     'attribute name should match the name of the ConfigItem'
                 )
-            self.__dict__['_items'][attr] = value
-        elif isinstance(value, ConfigContainer):
-            self.__dict__['_items'][attr] = value
+            self._items[attr] = value
+        elif value_type is ConfigContainer or isinstance(value, ConfigContainer):
+            self._items[attr] = value
         elif attr == '_comment':
-            self.__dict__['_comment'] = value
-        elif attr in self._items:
-            if isinstance(self._items[attr], ConfigItem):
-                # implicitly update value of an existing ConfigItem
-                self.__dict__['_items'][attr].value = value
-            elif isinstance(self._items[attr], ConfigContainer):
-                # replace an existing container with an implicitly created ConfigItem
-                # we currently accept this but log a warning
-                logger.warning('a subcontainer by the name {attr} exists')
-                self.__dict__['_items'][attr] = ConfigItem(name=attr, value=value)
-        else:
+            object.__setattr__(self, attr, value)
+        elif (existing := self._items.get(attr)) is None:
             # implicitly create a new ConfigItem (syntax sec.item = value)
-            self.__dict__['_items'][attr] = ConfigItem(name=attr, value=value)
+            self._items[attr] = ConfigItem(name=attr, value=value)
+        elif isinstance(existing, ConfigItem):
+            # implicitly update value of an existing ConfigItem
+            existing.value = value
+        else:
+            # replace an existing container with an implicitly created ConfigItem
+            # we currently accept this but log a warning
+            logger.warning(f'a subcontainer by the name {attr} exists')
+            self._items[attr] = ConfigItem(name=attr, value=value)
 
     def __repr__(self):
         s = '<ConfigContainer |'
-        items = [name for name, it in self._items.items() if isinstance(it, ConfigItem)]
+        # partition the names into items and sections in a single pass
+        items, sections = list(), list()
+        for name, it in self._items.items():
+            (items if isinstance(it, ConfigItem) else sections).append(name)
         if items:
             s += ' items: '
-            s += ', '.join(f"'{key}'" for key in items)
-        sections = [
-            name for name, it in self._items.items() if isinstance(it, ConfigContainer)
-        ]
+            s += ', '.join(map("'{}'".format, items))
         if sections:
             if items:
                 s += ','
             s += ' sections: '
-            s += ', '.join(f"'{key}'" for key in sections)
+            s += ', '.join(map("'{}'".format, sections))
         s += '>'
         return s
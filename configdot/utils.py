@@ -5,54 +5,159 @@ Utils for parsing INI files and handling config objects.
 @author: Jussi (jnu@iki.fi)
 """
 import ast
+import copy
+import functools
+import os
+import pickle
 import re
 import logging
 import sys
 
-from .configdot import ConfigContainer, ConfigItem
+from .configdot import ConfigContainer, ConfigItem, _copy_literal
 
 logger = logging.getLogger(__name__)
 
+_IS_WINDOWS = sys.platform == 'win32'
+# the Windows encoding warning is only logged on the first parse_config() call
+_encoding_warning_shown = False
 
-# regexes for parsing
-RE_WHITESPACE = r'\s*$'  # empty or whitespace
-# match line comment; group 1 will be the comment
-RE_COMMENT = r'\s*[#;]\s*(.*)'
+
+# regex patterns for the different kinds of lines. They are compiled
+# individually, and also combined into the line regex used by the parser, so
+# that both always agree. The named groups also work as numbered groups in the
+# individually compiled regexes.
+# empty or whitespace; the str.isspace() fast path in _parse_config_lines() must
+# agree with this pattern
+_WHITESPACE_PATTERN = r'\s*$'
+# line comment; group 1 will be the comment
+_COMMENT_PATTERN = r'\s*[#;]\s*(?P<comment_text>.*)'
 # whitespace, alphanumeric item name (at least 1 char), whitespace, equals sign,
 # item value (may be anything at this point) is matched non-greedily so it doesn't
 # match the trailing whitespace, trailing whitespace
-RE_ITEM_DEF = r'\s*(\w+)\s*=\s*(.*?)\s*$'
+# NOTE: the str.partition() fast path in _parse_config_lines() must accept the
+# same lines as this pattern, and split them into the same name and value
+_ITEM_DEF_PATTERN = r'\s*(?P<item_name>\w+)\s*=\s*(?P<item_value>.*?)\s*$'
 # whitespace, 1 or more ['s, section name, 1 or more ]'s, whitespace, end of line
 # the regex doesn't check that the opening and closing brackets match, it's
 # done by the Python code instead
-RE_SECTION_HEADER = r'\s*(\[+)([\w-]+)(\]+)\s*$'
-
-
-def _simple_match(r, s):
-    """Match regex r against string s"""
-    return bool(re.match(r, s))
-
+_SECTION_HEADER_PATTERN = (
+    r'\s*(?P<opening>\[+)(?P<section_name>[\w-]+)(?P<closing>\]+)\s*$'
+)
+
+# compiled regexes for parsing
+RE_WHITESPACE = re.compile(_WHITESPACE_PATTERN)
+RE_COMMENT = re.compile(_COMMENT_PATTERN)
+RE_ITEM_DEF = re.compile(_ITEM_DEF_PATTERN)
+RE_SECTION_HEADER = re.compile(_SECTION_HEADER_PATTERN)
+
+# all of the above combined into a single regex, so that the parser can
+# classify a line with one match; the name of the matching alternative is given
+# by the lastgroup attribute of the match object. The alternatives are mutually
+# exclusive, and ordered by their typical frequency so that the common lines
+# fail as few alternatives as possible. Lines that match none of them
+# (continuation lines or syntax errors) match the final empty alternative named
+# 'other'.
+_RE_LINE = re.compile(
+    f'(?P<item>{_ITEM_DEF_PATTERN})'
+    f'|(?P<whitespace>{_WHITESPACE_PATTERN})'
+    f'|(?P<comment>{_COMMENT_PATTERN})'
+    f'|(?P<section>{_SECTION_HEADER_PATTERN})'
+    '|(?P<other>)'
+)
+
+
+# literals that are evaluated without invoking the Python parser
+_FAST_LITERALS = {'True': True, 'False': False, 'None': None}
+# decimal float literals, e.g. 1.5, -1., .5, 1e5, 1.5e-3
+_RE_FAST_FLOAT = re.compile(
+    r'-?(?:[0-9]+\.[0-9]*|\.[0-9]+|[0-9]+(?=[eE]))(?:[eE][-+]?[0-9]+)?$'
+)
+
+
+def _fast_literal_eval(s):
+    """Evaluate common simple literals without invoking ast.literal_eval().
+
+    Handles booleans, None, decimal integers and floats, and quoted strings
+    without escapes. Returns a tuple of (value, True) if successful, or
+    (None, False) if s needs to be evaluated by ast.literal_eval() instead.
+    """
+    if s in _FAST_LITERALS:
+        return _FAST_LITERALS[s], True
+    if not s or not s.isascii():
+        return None, False
+    c = s[0]
+    if c == '-' or c == '.' or c.isdigit():
+        digits = s[1:] if c == '-' else s
+        # Python does not allow leading zeros in nonzero integer literals
+        if digits.isdigit() and (digits[0] != '0' or not digits.strip('0')):
+            return int(s), True
+        if _RE_FAST_FLOAT.match(s):
+            return float(s), True
+    elif (
+        c in '\'"'
+        and len(s) >= 2
+        and s[-1] == c
+        and c not in s[1:-1]
+        and '\\' not in s
+    ):
+        return s[1:-1], True
+    return None, False
+
+
+@functools.lru_cache(maxsize=256)
+def _literal_eval_cached(s):
+    return ast.literal_eval(s)
+
+
+def _literal_eval(s):
+    """Evaluate a literal, caching the results for repeated strings.
+
+    Mutable (or possibly mutable) results are copied so that items do not
+    share them.
+    """
+    val, ok = _fast_literal_eval(s)
+    if ok:
+        return val
+    return _copy_literal(_literal_eval_cached(s))
 
-def _parse_item_def(s):
-    """Match (possibly partial) config item definition.
 
-    Return varname, val tuple if successful"""
-    if m := re.match(RE_ITEM_DEF, s):
-        varname, val = m.group(1), m.group(2)
-        return varname, val
+_RE_BRACKET_OR_QUOTE = re.compile(r'[\'"()\[\]{}]')
+# for each string delimiter, match either the delimiter or an escape sequence
+_RE_STRING_END = {
+    quote: re.compile(r'\\.|' + quote, re.DOTALL)
+    for quote in ("'", '"', "'''", '"""')
+}
 
 
-def _parse_section_header(s):
-    """Match section or subsection (or subsubsection etc.) header.
+def _scan_brackets(s, depth=0, quote=None):
+    """Track bracket nesting over a (partial) definition.
 
-    Headers are written e.g. [header] or [[header]] etc. where the number of
-    brackets indicates the level of nesting (here 1 and 2, respectively)
-    Returns a tuple of (sec_name, sec_level).
+    Returns the updated (depth, quote) tuple, where depth is the number of open
+    brackets and quote is the delimiter of an open string literal, or None.
+    Pass the returned state back in to continue scanning over the next line.
     """
-    if m := re.match(RE_SECTION_HEADER, s):
-        opening, closing = m.group(1), m.group(3)
-        if (sec_level := len(opening)) == len(closing):
-            return m.group(2), sec_level
+    i, n = 0, len(s)
+    while i < n:
+        if quote:
+            # jump to the closing delimiter, skipping escaped characters
+            m = _RE_STRING_END[quote].search(s, i)
+            if m is None:
+                break
+            i = m.end()
+            if m.group() == quote:
+                quote = None
+            continue
+        # jump to the next bracket or string delimiter
+        if (m := _RE_BRACKET_OR_QUOTE.search(s, i)) is None:
+            break
+        c, i = m.group(), m.start()
+        if c in '\'"':
+            quote = c * 3 if s.startswith(c * 3, i) else c
+            i += len(quote)
+            continue
+        depth += 1 if c in '([{' else -1
+        i += 1
+    return depth, quote
 
 
 def get_description(item_or_section):
@@ -76,7 +181,7 @@ def get_description(item_or_section):
     return desc[:1].upper() + desc[1:]
 
 
-def parse_config(fname, encoding=None):
+def parse_config(fname, encoding=None, use_disk_cache=False):
     """Parse a configuration file.
 
     Parameters:
@@ -88,25 +193,102 @@ def parse_config(fname, encoding=None):
         the locale. On most Windows, this is still cp1252 instead of utf-8. If
         your configuration files are in utf-8 (as they probably will be), you
         need to specify encoding='utf-8' to correctly read extended characters.
+    use_disk_cache : bool
+        If True, the parsed config is also pickled into a cache file next to
+        the config file (with the extra suffix '.parsecache'), and loaded from
+        there on subsequent calls while the config file is unchanged. Since
+        unpickling can execute arbitrary code, only enable this if the cache
+        file location cannot be written to by untrusted users.
 
     Returns:
     -------
     ConfigContainer
         The config object.
+
+    Parsed configs are cached in memory, keyed by the file path, size,
+    modification time, inode number and ctime, so repeated calls on an
+    unchanged file skip the parsing. Each call returns an independent copy that
+    may be freely modified. Use parse_config.cache_clear() to empty the cache.
     """
-    if encoding is None and sys.platform == 'win32':
+    global _encoding_warning_shown
+    if encoding is None and _IS_WINDOWS and not _encoding_warning_shown:
         logger.warning(
             "On Windows, you need to explicitly specify encoding='utf-8' "
             "if your config file is encoded with UTF-8."
         )
-    with open(fname, 'r', encoding=encoding) as f:
-        lines = f.read().splitlines()
-    return _parse_config_lines(lines)
+        _encoding_warning_shown = True
+    path = os.path.abspath(fname)
+    st = os.stat(path)
+    # the inode number and ctime catch files that were replaced or rewritten
+    # while keeping their size and mtime (e.g. by cp -p or rsync -t)
+    cache_key = (st.st_size, st.st_mtime_ns, st.st_ino, st.st_ctime_ns, encoding)
+    if use_disk_cache:
+        # a freshly unpickled config is not shared with anyone, so it can be
+        # returned without copying
+        if (cfg := _load_disk_cache(path, cache_key)) is not None:
+            return cfg
+    cfg = _parse_config_cached(path, *cache_key)
+    if use_disk_cache:
+        _save_disk_cache(path, cache_key, cfg)
+    return copy.deepcopy(cfg)
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_config_cached(path, size, mtime_ns, ino, ctime_ns, encoding):
+    """Parse a config file. The stat args serve as the cache key."""
+    with open(path, 'r', encoding=encoding) as f:
+        # stream the lines instead of reading the whole file into memory
+        return _parse_config_lines(line.rstrip('\n') for line in f)
+
+
+# identifies the format of the disk cache files; the version must be increased
+# whenever the pickled layout of the config classes changes, so that cache files
+# written by other versions are ignored instead of unpickled
+_DISK_CACHE_FORMAT = ('configdot', 1, pickle.HIGHEST_PROTOCOL)
+
+
+def _disk_cache_path(path):
+    return path + '.parsecache'
+
+
+def _load_disk_cache(path, cache_key):
+    """Load a pickled config, if the cache file exists and matches cache_key"""
+    try:
+        with open(_disk_cache_path(path), 'rb') as f:
+            # the config is pickled separately, so that a stale cache can be
+            # detected without unpickling the whole config
+            stored = pickle.load(f)
+            if stored[:2] == (_DISK_CACHE_FORMAT, cache_key):
+                return pickle.loads(stored[2])
+    except FileNotFoundError:
+        pass
+    except Exception:
+        logger.warning(f'could not load the cache file for {path}, ignoring it')
+
+
+def _save_disk_cache(path, cache_key, cfg):
+    """Pickle a config into a cache file"""
+    cfg_bytes = pickle.dumps(cfg, protocol=pickle.HIGHEST_PROTOCOL)
+    try:
+        with open(_disk_cache_path(path), 'wb') as f:
+            pickle.dump(
+                (_DISK_CACHE_FORMAT, cache_key, cfg_bytes),
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+    except OSError:
+        # e.g. the config directory is read-only
+        logger.warning(f'could not write the cache file for {path}')
+
+
+parse_config.cache_clear = _parse_config_cached.cache_clear
 
 
 def _parse_config_lines(lines):
     """Parse INI file lines into a ConfigContainer instance.
 
+    lines may be any iterable of strings without line terminators.
+
     Supports:
         -multiline variable definitions
         -multiple comment lines per item/section
@@ -117,58 +299,70 @@ def _parse_config_lines(lines):
     current_item_name = None
     comment_lines = list()  # comments for current variable
     current_def_lines = list()  # definition lines for current variable
+    # bracket depth and open string delimiter for current variable
+    def_depth, def_quote = 0, None
     config = ConfigContainer()  # the 'root container'
-    # mapping of section -> section level; 0 is the root, 1 is a section, 2 is a
-    # subsection, etc.
-    sections = [(config, 0)]
+    # stack of currently open sections, indexed by section level; 0 is the
+    # root, 1 is a section, 2 is a subsection, etc.
+    parent_stack = [config]
 
     # loop through the lines
-    # every line is either: comment, section header, variable definition,
-    # continuation of variable definition, or whitespace
-    for lnum, li in enumerate(lines, 1):
-
-        if (sec_def := _parse_section_header(li)) is not None:
-            if current_item_name:  # did not finish previous definition
-                raise ValueError(f'could not evaluate definition at line {lnum}')
-            secname, sec_level = sec_def
-            comment = '\n'.join(comment_lines)
-            current_section = ConfigContainer(comment=comment)
-            sections.append((current_section, sec_level))
-            parents = [sec for sec, level in sections if level == sec_level - 1]
-            if not parents:
-                raise ValueError(f'subsection outside a parent section at line {lnum}')
-            else:
-                latest_parent = parents[-1]
-            setattr(latest_parent, secname, current_section)
-            comment_lines = list()
-
-        elif _simple_match(RE_COMMENT, li):
-            if current_item_name:
-                raise ValueError(f'could not evaluate definition at line {lnum}')
-            m = re.match(RE_COMMENT, li)
-            cmnt = m.group(1)
-            comment_lines.append(cmnt)
-
-        elif _simple_match(RE_WHITESPACE, li):
-            if current_item_name:
-                raise ValueError(f'could not evaluate definition at line {lnum}')
+    # every line is either: variable definition, whitespace, comment, section
+    # header, or continuation of variable definition; the cases are checked
+    # roughly in the order of their typical frequency. Simple item definitions
+    # and blank lines are recognized with string methods, and only the
+    # remaining lines are classified by the combined regex. This beats
+    # matching every line by map(_RE_LINE.match, lines), since most lines
+    # then need no regex match at all.
+    for lnum, line in enumerate(lines, 1):
+
+        # fast path for the most common case of a simple item definition; an
+        # ASCII identifier before the first '=' is exactly what RE_ITEM_DEF
+        # would match as the item name, so the result is the same
+        name, sep, val = line.partition('=')
+        if sep and (name := name.strip()).isidentifier() and name.isascii():
+            kind = 'item'
+            val = val.strip()
+        elif not line or line.isspace():
+            # blank lines are common, so check them without invoking the regex
+            kind = 'whitespace'
+        else:
+            # with the catch-all alternative, every line gives a match
+            m = _RE_LINE.match(line)
+            kind = m.lastgroup
+            # headers are written e.g. [header] or [[header]] etc. where the
+            # number of brackets indicates the level of nesting; the regex
+            # doesn't check that the brackets match
+            if kind == 'section' and len(m['opening']) != len(m['closing']):
+                kind = 'other'
+            elif kind == 'item':
+                name, val = m['item_name'], m['item_value']
 
         # new item definition
-        elif (item_def := _parse_item_def(li)) is not None:
-            item_name, val = item_def
+        if kind == 'item':
+            # interning the names speeds up the dict lookups by name and
+            # shares the strings between configs
+            item_name = sys.intern(name)
             if current_item_name:
                 raise ValueError(f'could not evaluate definition at line {lnum}')
             elif not current_section:
                 raise ValueError(f'item definition outside of a section on line {lnum}')
             elif item_name in current_section:
                 raise ValueError(f'duplicate definition on line {lnum}')
+            def_depth, def_quote = _scan_brackets(val)
+            # a definition with open brackets or strings must continue on the
+            # following lines, so don't waste time trying to evaluate it
+            if def_depth > 0 or def_quote:
+                current_item_name = item_name
+                current_def_lines.append(val)
+                continue
             try:
-                val_eval = ast.literal_eval(val)
+                val_eval = _literal_eval(val)
                 # if eval is successful, record the variable
-                comment = '\n'.join(comment_lines)
+                comment = '\n'.join(comment_lines) if comment_lines else ''
+                comment_lines.clear()
                 item = ConfigItem(comment=comment, name=item_name, value=val_eval)
                 setattr(current_section, item_name, item)
-                comment_lines = list()
                 current_def_lines = list()
                 current_item_name = None
             except (ValueError, SyntaxError):  # eval failed, continued def?
@@ -176,21 +370,50 @@ def _parse_config_lines(lines):
                 current_def_lines.append(val)
                 continue
 
+        elif kind == 'whitespace':
+            if current_item_name:
+                raise ValueError(f'could not evaluate definition at line {lnum}')
+
+        elif kind == 'comment':
+            if current_item_name:
+                raise ValueError(f'could not evaluate definition at line {lnum}')
+            comment_lines.append(m['comment_text'])
+
+        elif kind == 'section':
+            if current_item_name:  # did not finish previous definition
+                raise ValueError(f'could not evaluate definition at line {lnum}')
+            secname, sec_level = sys.intern(m['section_name']), len(m['opening'])
+            comment = '\n'.join(comment_lines) if comment_lines else ''
+            comment_lines.clear()
+            current_section = ConfigContainer(comment=comment)
+            # close any sections at the same or deeper level
+            del parent_stack[sec_level:]
+            if len(parent_stack) != sec_level:
+                raise ValueError(f'subsection outside a parent section at line {lnum}')
+            setattr(parent_stack[-1], secname, current_section)
+            parent_stack.append(current_section)
+
         else:  # if none of the above, must be a continuation or syntax error
             if current_item_name:
-                current_def_lines.append(li.strip())
+                line = line.strip()
+                current_def_lines.append(line)
+                def_depth, def_quote = _scan_brackets(line, def_depth, def_quote)
             else:
-                raise ValueError(f'syntax error at line {lnum}: {li}')
+                raise ValueError(f'syntax error at line {lnum}: {line}')
+            # the definition cannot be complete while brackets or strings are
+            # still open, so don't waste time trying to evaluate it
+            if def_depth > 0 or def_quote:
+                continue
             # try to finish the def
             try:
                 val_new = ''.join(current_def_lines)
-                val_eval = ast.literal_eval(val_new)
-                comment = ' '.join(comment_lines)
+                val_eval = _literal_eval(val_new)
+                comment = '\n'.join(comment_lines) if comment_lines else ''
+                comment_lines.clear()
                 item = ConfigItem(
                     comment=comment, name=current_item_name, value=val_eval
                 )
                 setattr(current_section, current_item_name, item)
-                comment_lines = list()
                 current_def_lines = list()
                 current_item_name = None
             except (ValueError, SyntaxError):  # cannot finish def (yet)
@@ -205,15 +428,27 @@ def _parse_config_lines(lines):
 def _traverse(container):
     """Recursively traverse a ConfigContainer.
 
-    Yields (name, item) tuples, where name is the fully qualified attribute name
-    (e.g. section.subsection.item) and item is the item.
+    Yields (name_parts, parent, name, item) tuples, where name_parts is the
+    fully qualified attribute name as a tuple (e.g. ('section', 'subsection',
+    'item') for section.subsection.item), parent is the container holding the
+    item, name is the item name and item is the item. The items are yielded in
+    depth-first order, i.e. the contents of a subcontainer immediately follow
+    the subcontainer itself.
     """
-    for name, item in container:
-        yield name, item
-        if isinstance(item, ConfigContainer):
-            yield from (
-                (f'{name}.{subname}', subitem) for subname, subitem in _traverse(item)
-            )
+    # use an explicit stack of (name_parts, container, iterator) tuples instead
+    # of recursion, to avoid creating a generator for each level of nesting
+    stack = [((), container, iter(container._items.items()))]
+    while stack:
+        parent_parts, parent, items = stack[-1]
+        for name, item in items:
+            name_parts = parent_parts + (name,)
+            yield name_parts, parent, name, item
+            if isinstance(item, ConfigContainer):
+                # descend; iteration of the current level resumes afterwards
+                stack.append((name_parts, item, iter(item._items.items())))
+                break
+        else:
+            stack.pop()
 
 
 def _get_attr_by_name(cfg, name_list):
@@ -221,10 +456,10 @@ def _get_attr_by_name(cfg, name_list):
 
     name_list is e.g. ['section', 'subsection', 'item'] for section.subsection.item
     """
-    name_list = name_list.copy()  # don't mutate the argument
-    attr0 = cfg[name_list.pop(0)]
-    # recurse until the final item in the attribute chain is reached
-    return _get_attr_by_name(attr0, name_list) if name_list else attr0
+    item = cfg
+    for name in name_list:
+        item = item[name]
+    return item
 
 
 def update_config(
@@ -255,33 +490,46 @@ def update_config(
     """
     if not (isinstance(create_new_items, bool) or isinstance(create_new_items, list)):
         raise TypeError('invalid create_new_items argument (must be list or bool)')
-    for name, item_new in _traverse(cfg_new):
-        name_list = name.split('.')  # e.g. 'section1.subsection1.var'
-        item_name = name_list[-1]  # e.g. 'var'
-        # get the parent section for this item in the orig config
+    # normalize create_new_items once, so that the loop below only needs a bool
+    # check and a set lookup; the section names are converted into name tuples,
+    # so that the parent names yielded by _traverse() can be looked up directly
+    allow_all_new_items = create_new_items is True
+    sections_for_new_items = (
+        {tuple(name.split('.')) if name else () for name in create_new_items}
+        if isinstance(create_new_items, list)
+        else set()
+    )
+    for name_parts, _, item_name, item_new in _traverse(cfg_new):
+        # e.g. ('section1', 'subsection1') for section1.subsection1.var
+        parent_name = name_parts[:-1]
+        # get the parent section for this item in the orig config; if parent
+        # name is empty, we're at the root container
         try:
-            if parent_name := name_list[:-1]:
-                parent = _get_attr_by_name(cfg_to_update, parent_name)
-            else:
-                # if parent name is empty, we're at the root container
-                parent = cfg_to_update
+            parent = _get_attr_by_name(cfg_to_update, parent_name)
         except KeyError:
             # item orphaned, since new sections cannot be created
             logger.warning(
-                f'There is no parent section for {name}, so it was discarded.'
-                'You need to enable creation of new sections to include it.'
+                f'There is no parent section for {".".join(name_parts)}, so it '
+                'was discarded. You need to enable creation of new sections to '
+                'include it.'
             )
             continue
         try:
             # try to find the item in the original config
             # if unsuccessful, this will raise a KeyError
-            item_to_update = _get_attr_by_name(cfg_to_update, name_list)
+            item_to_update = parent[item_name]
             # ConfigContainers don't need updating, except for the comments;
             # their contents will be updated separately
             if isinstance(item_new, ConfigContainer):
                 if update_comments:
-                    item_to_update._comment = item_new._comment    
+                    item_to_update._comment = item_new._comment
+            elif isinstance(item_to_update, ConfigItem):
+                # update the existing item in place
+                item_to_update.value = item_new.value
+                if update_comments:
+                    item_to_update._comment = item_new._comment
             else:
+                # an item replaces a section of the same name
                 comment = item_new._comment if update_comments else item_to_update._comment
                 item_updated = ConfigItem(item_new.name, item_new.value, comment)
                 setattr(parent, item_name, item_updated)
@@ -293,10 +541,7 @@ def update_config(
                 section = ConfigContainer(comment=item_new._comment)
                 setattr(parent, item_name, section)
             elif isinstance(item_new, ConfigItem):
-                if create_new_items is True or (
-                    isinstance(create_new_items, list)
-                    and '.'.join(parent_name) in create_new_items
-                ):
+                if allow_all_new_items or parent_name in sections_for_new_items:
                     item_new = ConfigItem(
                         name=item_name, value=item_new.value, comment=item_new._comment
                     )
@@ -304,18 +549,20 @@ def update_config(
 
 
 def _dump_config(cfg):
-    """Return a config instance as text. Yields lines"""
-    for attr, item_or_section in _traverse(cfg):
-        name = attr.split('.')[-1]
+    """Return a config instance as text. Returns a list of lines"""
+    lines = list()
+    # bind the list methods once, outside the loop
+    append, extend = lines.append, lines.extend
+    for name_parts, _, name, item_or_section in _traverse(cfg):
         if comment := item_or_section._comment:
-            for comment_line in comment.split('\n'):
-                yield f'# {comment_line}'
+            extend(f'# {comment_line}' for comment_line in comment.split('\n'))
         if isinstance(item_or_section, ConfigContainer):
-            level = attr.count('.') + 1
+            level = len(name_parts)
             opening, closing = '[' * level, ']' * level
-            yield f'{opening}{name}{closing}'
+            append(f'{opening}{name}{closing}')
         elif isinstance(item_or_section, ConfigItem):
-            yield item_or_section.item_def
+            append(item_or_section.item_def)
+    return lines
 
 
 def dump_config(cfg):
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Shared fixtures for the tests
+
+@author: jussi (jnu@iki.fi)
+"""
+
+from pathlib import Path
+import copy
+import pytest
+
+from configdot import parse_config
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--update-goldens',
+        action='store_true',
+        help='regenerate the golden files in testdata instead of comparing',
+    )
+
+
+@pytest.fixture
+def update_goldens(request):
+    """Whether the golden files should be regenerated"""
+    return request.config.getoption('--update-goldens')
+
+
+@pytest.fixture(scope='session')
+def testdata():
+    """The directory of the test data files"""
+    return Path(__file__).resolve().parent / 'testdata'
+
+
+@pytest.fixture(scope='session')
+def valid_cfg_template(testdata):
+    """The parsed valid.cfg; tests that modify it must use a deep copy"""
+    return parse_config(testdata / 'valid.cfg')
+
+
+@pytest.fixture
+def valid_cfg(valid_cfg_template):
+    """A private deep copy of the parsed valid.cfg that tests may modify"""
+    return copy.deepcopy(valid_cfg_template)
+
+
+@pytest.fixture(scope='session')
+def updates_cfg(testdata):
+    """The parsed updates.cfg; tests that modify it must use a deep copy"""
+    return parse_config(testdata / 'updates.cfg')
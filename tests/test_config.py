@@ -6,11 +6,14 @@ Test the config interface
 @author: jussi (jnu@iki.fi)
 """
 
-from pathlib import Path
 import pytest
 import logging
-import re
+import os
 import ast
+import itertools
+import copy
+import pickle
+import pprint
 
 from configdot import (
     parse_config,
@@ -20,20 +23,20 @@ from configdot import (
     ConfigItem,
 )
 from configdot.utils import (
+    RE_WHITESPACE,
     RE_COMMENT,
     RE_SECTION_HEADER,
     RE_ITEM_DEF,
+    _RE_LINE,
+    _fast_literal_eval,
     _parse_config_lines,
+    _traverse,
 )
 
 
 logger = logging.getLogger(__name__)
 
 
-def _file_path(filename):
-    return Path('testdata') / filename
-
-
 def test_configcontainer():
     """Tests for the ConfigContainer class"""
     cc = ConfigContainer()
@@ -41,11 +44,13 @@ def test_configcontainer():
     cc.foo = 1
     assert cc.foo == 1
     assert 'foo' in cc
-    assert isinstance(cc['foo'], ConfigItem)
-    # modify a ConfigItem
+    item = cc['foo']
+    assert isinstance(item, ConfigItem)
+    # modify a ConfigItem; the existing item must be updated in place
     cc.foo = 2
     assert cc.foo == 2
-    assert isinstance(cc['foo'], ConfigItem)
+    assert cc['foo'] is item
+    assert item.value == 2
     ci = ConfigItem('bar', value=3, comment='test comment')
     # assign an explicitly created ConfigItem
     cc.bar = ci
@@ -66,10 +71,23 @@ def test_configcontainer():
     ccsub2 = ConfigContainer(comment='another section')
     cc.sub = ccsub2
     assert cc.sub._comment == 'another section'
+    cc.sub2 = ConfigContainer()
+    assert repr(cc) == "<ConfigContainer | items: 'foo', 'bar', sections: 'sub', 'sub2'>"
+    # missing attributes, including special ones, raise AttributeError
+    with pytest.raises(AttributeError):
+        cc.nonexistent
+    with pytest.raises(AttributeError):
+        cc.__nonexistent__
+    assert not hasattr(cc, '__len__')
     # implicitly replace the container with an item
     cc.sub = 1
     assert isinstance(cc['sub'], ConfigItem)
     assert cc.sub == 1
+    # names of internal attributes other than _comment are stored as items
+    cc['_items'] = 1
+    assert isinstance(cc['_items'], ConfigItem)
+    cc.foo = 3
+    assert cc.foo == 3
 
 
 def test_configitem():
@@ -81,6 +99,12 @@ def test_configitem():
     assert ci.value == 2
     assert ci.literal_value == '2'
     assert ci.item_def == 'bar = 2'
+    assert ConfigItem('bar', 'baz').item_def == "bar = 'baz'"
+    # long strings are wrapped by pprint
+    long_str = 'word ' * 30
+    ci = ConfigItem('bar', long_str)
+    assert ci.item_def == f'bar = {pprint.pformat(long_str)}'
+    assert '\n' in ci.item_def
     # item with a dict value
     di = {1: None, 2: 2}
     ci = ConfigItem('bar', di)
@@ -89,70 +113,195 @@ def test_configitem():
     assert dival == di
 
 
-def test_re_comment():
+class _MyContainer(ConfigContainer):
+    __slots__ = ()
+
+
+class _MyItem(ConfigItem):
+    __slots__ = ()
+
+
+def test_subclasses():
+    """Test that subclasses of the config classes are handled as such"""
+    cfg = ConfigContainer()
+    cfg.sec = _MyContainer()
+    assert 'sec' in cfg
+    cfg.sec.x = _MyItem('x', 1)
+    assert cfg.sec.x == 1
+    cfg.sec.x = 2
+    assert type(cfg.sec['x']) is _MyItem
+    assert repr(cfg.sec) == "<ConfigContainer | items: 'x'>"
+    txt = dump_config(cfg)
+    assert txt.splitlines() == ['[sec]', 'x = 2']
+    assert _parse_config_lines(txt.splitlines()) == cfg
+    cfg_copy = copy.deepcopy(cfg)
+    assert type(cfg_copy.sec) is _MyContainer
+    assert type(cfg_copy.sec['x']) is _MyItem
+
+
+def test_copy_pickle(testdata):
+    """Test copying and pickling of configs"""
+    cfg = parse_config(testdata / 'valid.cfg')
+    # the classes use __slots__ instead of instance dicts
+    assert not hasattr(cfg, '__dict__')
+    assert not hasattr(cfg.section1['var1'], '__dict__')
+    cfg_copy = copy.deepcopy(cfg)
+    assert cfg_copy == cfg
+    assert type(cfg_copy.section1) is ConfigContainer
+    # the copy must not share mutable values with the original
+    assert cfg_copy.section2.foo is not cfg.section2.foo
+    cfg_copy.section2.foo.append(1)
+    assert cfg_copy.section2.foo != cfg.section2.foo
+    # objects referenced more than once must be copied only once
+    d = copy.deepcopy({'cfg': cfg, 'sec': cfg.section1, 'item': cfg.section1['var1']})
+    assert d['sec'] is d['cfg'].section1
+    assert d['item'] is d['cfg'].section1['var1']
+    # self-referencing values
+    li = [1]
+    li.append(li)
+    cc = ConfigContainer()
+    cc.li = li
+    li_copy = copy.deepcopy(cc).li
+    assert li_copy is not li
+    assert li_copy[1] is li_copy
+    assert pickle.loads(pickle.dumps(cfg)) == cfg
+
+
+CMT_STRING = 'this is a comment'
+
+
+@pytest.mark.parametrize(
+    'leading,comment_sign,ws1,trailing',
+    itertools.product(['', ' ', ' ' * 5], '#;', ['', ' '], [' ' * 5, ' ' * 3, '']),
+)
+def test_re_comment(leading, comment_sign, ws1, trailing):
     """Test comment regex on various comments"""
-    cmt_string = 'this is a comment'
-    for leading in ['', ' ', ' ' * 5]:
-        for comment_sign in '#;':
-            for ws1 in ['', ' ']:
-                for trailing in [' ' * 5, ' ' * 3, '']:
-                    cmt = leading + comment_sign + ws1 + cmt_string + trailing
-                    assert re.match(RE_COMMENT, cmt)
-                    # the regex group will include trailing whitespace
-                    # so test group extraction without whitespace
-                    cmt = leading + comment_sign + ws1 + cmt_string
-                    m = re.match(RE_COMMENT, cmt)
-                    assert m.group(1) == cmt_string
-
-
-def test_re_item_def():
+    cmt = leading + comment_sign + ws1 + CMT_STRING + trailing
+    assert RE_COMMENT.match(cmt)
+    # the regex group will include trailing whitespace
+    # so test group extraction without whitespace
+    cmt = leading + comment_sign + ws1 + CMT_STRING
+    m = RE_COMMENT.match(cmt)
+    assert m.group(1) == CMT_STRING
+
+
+@pytest.mark.parametrize(
+    's,expected_name,expected_val',
+    [
+        # various whitespace
+        ('a=1', 'a', '1'),
+        ('a = 1', 'a', '1'),
+        (' a = 1 ', 'a', '1'),
+        # definition of string with equals
+        ('a = "b=1"', 'a', '"b=1"'),
+    ],
+)
+def test_re_item_def(s, expected_name, expected_val):
     """Test item definition regex"""
-    dli = list()
-    # various whitespace
-    dli = ['a=1', 'a = 1', ' a = 1 ']
-    for d in dli:
-        m = re.match(RE_ITEM_DEF, d)
-        assert m.group(1) == 'a'
-        assert m.group(2) == '1'
-    # definition of string with equals
-    d = 'a = "b=1"'
-    m = re.match(RE_ITEM_DEF, d)
-    assert m.group(1) == 'a'
-    assert m.group(2) == '"b=1"'
-    # no equals
-    d = 'abc foo'
-    assert not re.match(RE_ITEM_DEF, d)
-    # no identifier
-    d = '=x'
-    assert not re.match(RE_ITEM_DEF, d)
-    # illegal chars in varname
-    d = 'a&b = c'
-    assert not re.match(RE_ITEM_DEF, d)
-
-
-def test_re_section_header():
-    sli = ['[foo]', ' [foo] ']
-    for s in sli:
-        assert re.match(RE_SECTION_HEADER, s)
-    s = '[ foo]'
-    assert not re.match(RE_SECTION_HEADER, s)
-    s = '[some/invalid/chars]'
-    assert not re.match(RE_SECTION_HEADER, s)
-    s = '[nice_chars_only]'
-    assert re.match(RE_SECTION_HEADER, s)
-    s = '[nice-chars-only]'
-    assert re.match(RE_SECTION_HEADER, s)
-    s = '[äöäöäöäöä]'
-    assert re.match(RE_SECTION_HEADER, s)
-
-
-def test_config():
+    m = RE_ITEM_DEF.match(s)
+    assert m.group(1) == expected_name
+    assert m.group(2) == expected_val
+
+
+@pytest.mark.parametrize(
+    's',
+    [
+        'abc foo',  # no equals
+        '=x',  # no identifier
+        'a&b = c',  # illegal chars in varname
+    ],
+)
+def test_re_item_def_invalid(s):
+    """Test item definition regex on invalid definitions"""
+    assert not RE_ITEM_DEF.match(s)
+
+
+@pytest.mark.parametrize(
+    's',
+    ['a=1', ' a = 1 ', '\ta\t=\t[1, 2]', 'a = "b=1"', '1a = 2', 'ä = 3', '_ = None'],
+)
+def test_parse_item_def(s):
+    """Test that the parser agrees with the item definition regex"""
+    m = RE_ITEM_DEF.match(s)
+    cfg = _parse_config_lines(['[section]', s])
+    assert list(cfg.section._items) == [m.group(1)]
+    assert cfg.section[m.group(1)].value == ast.literal_eval(m.group(2))
+
+
+@pytest.mark.parametrize(
+    's',
+    ['[foo]', ' [foo] ', '[nice_chars_only]', '[nice-chars-only]', '[äöäöäöäöä]'],
+)
+def test_re_section_header(s):
+    assert RE_SECTION_HEADER.match(s)
+
+
+@pytest.mark.parametrize('s', ['[ foo]', '[some/invalid/chars]'])
+def test_re_section_header_invalid(s):
+    assert not RE_SECTION_HEADER.match(s)
+
+
+def test_multiline_brackets():
+    """Test multiline defs containing brackets and quotes inside strings"""
+    lines = [
+        '[section]',
+        '# first comment line',
+        '# second comment line',
+        'a = [1,',
+        '     "b]", \'(\',',
+        '     3]',
+        'b = {"c": [1,',
+        '           2]}',
+        'c = \'\'\'first',
+        'second\'s\'\'\'',
+    ]
+    cfg = _parse_config_lines(lines)
+    assert cfg.section.a == [1, 'b]', '(', 3]
+    assert cfg.section['a']._comment == 'first comment line\nsecond comment line'
+    assert cfg.section['b']._comment == ''
+    assert cfg.section.b == {'c': [1, 2]}
+    assert cfg.section.c == "firstsecond's"
+
+
+def test_fast_literal_eval():
+    """Test that the fast path agrees with ast.literal_eval"""
+    fast = ['True', 'None', '0', '00', '-12', '1.5', '-1.', '1.5e-3', '1e5', '-.5']
+    fast += ["'a'", '""']
+    slow = ['01', '1_000', '-inf', "'a\\nb'", "'''a'''", "b'x'", '[1]', '-', '.', 'e5']
+    for s in fast:
+        val, ok = _fast_literal_eval(s)
+        assert ok
+        assert val == ast.literal_eval(s)
+        assert type(val) is type(ast.literal_eval(s))
+    for s in slow:
+        assert _fast_literal_eval(s) == (None, False)
+
+
+def test_re_line():
+    """Test line classification by the combined regex"""
+    assert _RE_LINE.match('').lastgroup == 'whitespace'
+    assert _RE_LINE.match('   ').lastgroup == 'whitespace'
+    assert RE_WHITESPACE.match('\t ')
+    assert not RE_WHITESPACE.match(' a')
+    m = _RE_LINE.match(' ; comment')
+    assert m.lastgroup == 'comment'
+    assert m['comment_text'] == 'comment'
+    m = _RE_LINE.match('[[sec]]')
+    assert m.lastgroup == 'section'
+    assert m['section_name'] == 'sec'
+    m = _RE_LINE.match(' a = "b=1" ')
+    assert m.lastgroup == 'item'
+    assert (m['item_name'], m['item_value']) == ('a', '"b=1"')
+    # continuation line
+    assert _RE_LINE.match('  [0, 1],').lastgroup == 'other'
+
+
+def test_config(valid_cfg_template):
     """Test reading of valid config"""
-    fn = _file_path('valid.cfg')
-    cfg_ = parse_config(fn)
+    cfg_ = valid_cfg_template
     assert 'section1' in cfg_
     assert 'section2' in cfg_
-    secs = sorted(secname for (secname, sec) in cfg_)
+    secs = sorted(secname for secname, _ in cfg_)
     assert secs == ['section1', 'section2', 'section3']
     assert cfg_.section1.var1 == 1
     assert cfg_.section1.var2 == ['list', 'continues']
@@ -162,41 +311,142 @@ def test_config():
     assert cfg_.section3.subsection3.baz == 1
 
 
-def test_extended_chars():
+def test_parse_cache(tmp_path, testdata):
+    """Test caching of parsed configs"""
+    fn = testdata / 'valid.cfg'
+    cfg1 = parse_config(fn)
+    cfg2 = parse_config(fn)
+    assert cfg1 == cfg2
+    # each call must return an independent copy
+    assert cfg1 is not cfg2
+    cfg1.section1.var1 = 'modified'
+    assert parse_config(fn).section1.var1 == 1
+    # modifying the file must invalidate the cache
+    fn_tmp = tmp_path / 'tmp.cfg'
+    fn_tmp.write_text('[section]\nvar = 1\n')
+    assert parse_config(fn_tmp).section.var == 1
+    fn_tmp.write_text('[section]\nvar = 22\n')
+    assert parse_config(fn_tmp).section.var == 22
+    # replacing the file by one of the same size and mtime (as e.g. cp -p
+    # does) must also invalidate the cache
+    st = fn_tmp.stat()
+    fn_new = tmp_path / 'new.cfg'
+    fn_new.write_text('[section]\nvar = 33\n')
+    os.utime(fn_new, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(fn_new, fn_tmp)
+    assert parse_config(fn_tmp).section.var == 33
+    parse_config.cache_clear()
+
+
+def test_repeated_literals():
+    """Test that items defined by identical literals do not share values"""
+    lines = ['[section]', 'a = [1, 2]', 'b = [1, 2]', 'c = 1', 'd = 1']
+    cfg = _parse_config_lines(lines)
+    assert cfg.section.a == cfg.section.b
+    assert cfg.section.a is not cfg.section.b
+    cfg.section.a.append(3)
+    assert cfg.section.b == [1, 2]
+    assert _parse_config_lines(lines).section.a == [1, 2]
+    # nested containers must not be shared either
+    lines = ['[section]', 'a = {"x": ([1], {2})}', 'b = {"x": ([1], {2})}']
+    cfg = _parse_config_lines(lines)
+    assert cfg.section.a == cfg.section.b
+    assert cfg.section.a['x'][0] is not cfg.section.b['x'][0]
+    assert cfg.section.a['x'][1] is not cfg.section.b['x'][1]
+
+
+def test_parse_disk_cache(tmp_path, monkeypatch):
+    """Test caching of parsed configs on disk"""
+    fn_tmp = tmp_path / 'tmp.cfg'
+    fn_tmp.write_text('[section]\nvar = 1\n')
+    cfg = parse_config(fn_tmp, use_disk_cache=True)
+    assert (tmp_path / 'tmp.cfg.parsecache').is_file()
+    parse_config.cache_clear()
+
+    def _fail(*args):
+        raise RuntimeError('config was parsed or copied instead of loaded')
+
+    # the config should now be loaded from the disk cache without parsing, and
+    # returned without an extra copy
+    with monkeypatch.context() as m:
+        m.setattr('configdot.utils._parse_config_lines', _fail)
+        m.setattr(ConfigContainer, '__deepcopy__', _fail)
+        assert parse_config(fn_tmp, use_disk_cache=True) == cfg
+    # modifying the file must invalidate the cache
+    parse_config.cache_clear()
+    fn_tmp.write_text('[section]\nvar = 22\n')
+    assert parse_config(fn_tmp, use_disk_cache=True).section.var == 22
+    parse_config.cache_clear()
+    # a cache file of another format version is ignored without unpickling
+    cache_file = tmp_path / 'tmp.cfg.parsecache'
+    _, cache_key, _ = pickle.loads(cache_file.read_bytes())
+    cache_file.write_bytes(pickle.dumps((('configdot', 0), cache_key, b'garbage')))
+    with monkeypatch.context() as m:
+        m.setattr('configdot.utils.logger.warning', _fail)
+        assert parse_config(fn_tmp, use_disk_cache=True).section.var == 22
+    parse_config.cache_clear()
+    # a corrupted cache file is ignored
+    (tmp_path / 'tmp.cfg.parsecache').write_bytes(b'garbage')
+    assert parse_config(fn_tmp, use_disk_cache=True).section.var == 22
+    parse_config.cache_clear()
+
+
+def test_dunder_item_names():
+    """Test items whose names start with double underscores"""
+    cfg = _parse_config_lines(['[s]', '__x = 1', '__y__ = 2'])
+    assert getattr(cfg.s, '__x') == 1
+    assert cfg.s.__y__ == 2
+    assert copy.deepcopy(cfg) == cfg
+    assert pickle.loads(pickle.dumps(cfg)) == cfg
+
+
+def test_extended_chars(testdata):
     """Test unicode parsing"""
-    fn = _file_path('extended_chars.cfg')
+    fn = testdata / 'extended_chars.cfg'
     cfg_ = parse_config(fn, encoding='utf-8')
     # section name with extended chars
     assert 'äöäööäö' in cfg_
     assert cfg_.äöäööäö.äööä == 'ääöäöä'
 
 
-def test_config_update():
-    fn = _file_path('valid.cfg')
-    fn_new = _file_path('updates.cfg')
-    cfg_orig = parse_config(fn)
-    cfg_new = parse_config(fn_new)
-    # test not updating comments
-    update_config(cfg_orig, cfg_new, update_comments=False)
+def test_config_update(valid_cfg, valid_cfg_template, updates_cfg, testdata):
+    """Test updating without comments"""
+    cfg_orig = valid_cfg
+    # a deep copy must be equivalent to a freshly parsed config; parse_config()
+    # would return a copy of the cached config, so bypass it
+    lines = (testdata / 'valid.cfg').read_text().splitlines()
+    assert cfg_orig == _parse_config_lines(lines)
+    item_orig = cfg_orig.section1['var1']
+    update_config(cfg_orig, updates_cfg, update_comments=False)
+    # existing items are updated in place
+    assert cfg_orig.section1['var1'] is item_orig
     assert cfg_orig.section1['var1']._comment == 'this is var1'
     assert cfg_orig.section1.var1 == 2
     assert 'section4' in cfg_orig
     assert 'newvar' in cfg_orig.section2
     assert cfg_orig.section1._comment == 'section1 comment'
-    cfg_orig = parse_config(fn)
-    # test updating comments
-    update_config(cfg_orig, cfg_new, update_comments=True)
+    # the shared template must not be affected
+    assert valid_cfg_template.section1.var1 == 1
+
+
+def test_config_update_comments(valid_cfg, updates_cfg):
+    """Test updating comments"""
+    cfg_orig = valid_cfg
+    update_config(cfg_orig, updates_cfg, update_comments=True)
     assert cfg_orig.section1['var1']._comment == 'this is var1 updated'
     assert cfg_orig.section1.var1 == 2
     assert 'section4' in cfg_orig
     assert 'newvar' in cfg_orig.section2
     assert cfg_orig.section1._comment == 'section1 updated comment'
     assert cfg_orig.section4.subsection4._comment == 'subsection4 new comment'
-    # test not creating new sections or items (but updating existing ones)
-    cfg_orig = parse_config(fn)
+
+
+def test_config_update_no_new(valid_cfg, updates_cfg):
+    """Test not creating new sections or items (but updating existing ones)"""
+    cfg_orig = valid_cfg
     update_config(
         cfg_orig,
-        cfg_new,
+        updates_cfg,
         create_new_sections=False,
         create_new_items=False,
         update_comments=False,
@@ -204,11 +454,14 @@ def test_config_update():
     assert 'section4' not in cfg_orig
     assert 'newvar' not in cfg_orig.section2
     assert cfg_orig.section1.var1 == 2  # updates must still succeed
-    # test limiting creation of new items
-    cfg_orig = parse_config(fn)
+
+
+def test_config_update_limited_items(valid_cfg, updates_cfg):
+    """Test limiting creation of new items"""
+    cfg_orig = valid_cfg
     update_config(
         cfg_orig,
-        cfg_new,
+        updates_cfg,
         create_new_sections=False,
         create_new_items=['section2'],
         update_comments=False,
@@ -220,11 +473,14 @@ def test_config_update():
     assert 'var4' not in cfg_orig.section3
     # however updates to existing variables must still succeed
     assert cfg_orig.section3.var3 == 4
-    # test creation of new sections
-    cfg_orig = parse_config(fn)
+
+
+def test_config_update_new_sections(valid_cfg, updates_cfg):
+    """Test creation of new sections"""
+    cfg_orig = valid_cfg
     update_config(
         cfg_orig,
-        cfg_new,
+        updates_cfg,
         create_new_sections=True,
         create_new_items=True,
         update_comments=False,
@@ -233,11 +489,14 @@ def test_config_update():
     assert 'section4' in cfg_orig
     assert 'subsection4' in cfg_orig.section4
     assert 'li' in cfg_orig.section4.subsection4
-    # test creation of new sections but not items
-    cfg_orig = parse_config(fn)
+
+
+def test_config_update_new_sections_no_items(valid_cfg, updates_cfg):
+    """Test creation of new sections but not items"""
+    cfg_orig = valid_cfg
     update_config(
         cfg_orig,
-        cfg_new,
+        updates_cfg,
         create_new_sections=True,
         create_new_items=False,
         update_comments=False,
@@ -248,42 +507,45 @@ def test_config_update():
     assert 'li' not in cfg_orig.section4.subsection4
 
 
-def test_orphaned_def():
+def test_orphaned_def(testdata):
     """Test cfg with def outside section"""
-    fn = _file_path('orphan.cfg')
+    fn = testdata / 'orphan.cfg'
     with pytest.raises(ValueError):
         parse_config(fn)
 
 
-def test_invalid_def():
+def test_invalid_def(testdata):
     """Test cfg with invalid def"""
-    fn = _file_path('invalid.cfg')
+    fn = testdata / 'invalid.cfg'
     with pytest.raises(ValueError):
         parse_config(fn)
 
 
-def test_invalid_def2():
+def test_invalid_def2(testdata):
     """Test cfg with invalid def"""
-    fn = _file_path('invalid2.cfg')
+    fn = testdata / 'invalid2.cfg'
     with pytest.raises(ValueError):
         parse_config(fn)
 
 
-def test_def_last_line():
+def test_def_last_line(testdata):
     """Test cfg with multiline def terminating on last line"""
-    fn = _file_path('def_last_line.cfg')
+    fn = testdata / 'def_last_line.cfg'
     cfg = parse_config(fn)
     assert 'foo' in cfg.section2
 
 
-def test_invalid_subsections():
-    fn = _file_path('subsections_invalid.cfg')
+@pytest.mark.parametrize(
+    'fname', ['subsections_invalid.cfg', 'subsections_invalid2.cfg']
+)
+def test_invalid_subsections(fname, testdata):
+    fn = testdata / fname
     with pytest.raises(ValueError):
         parse_config(fn)
 
 
-def test_valid_subsections():
-    fn = _file_path('subsections_valid.cfg')
+def test_valid_subsections(testdata):
+    fn = testdata / 'subsections_valid.cfg'
     cfg = parse_config(fn)
     assert 'section1' in cfg
     assert 'subsubsection1' in cfg.section1.subsection1
@@ -291,10 +553,33 @@ def test_valid_subsections():
     assert cfg.section1.subsection1.subsubsection2.var1 == 3
 
 
-def test_write_read_cycle():
-    for fn in [_file_path('valid.cfg'), _file_path('updates.cfg')]:
-        cfg_ = parse_config(fn)
-        txt = dump_config(cfg_)
-        txtlines = txt.split('\n')
-        cfg_back = _parse_config_lines(txtlines)
-        assert cfg_ == cfg_back
+def test_traverse(testdata):
+    """Test depth-first traversal order"""
+    cfg = parse_config(testdata / 'subsections_valid.cfg')
+    names = ['.'.join(name_parts) for name_parts, *_ in _traverse(cfg)]
+    assert names == [
+        'section1',
+        'section1.var1',
+        'section1.subsection1',
+        'section1.subsection1.subsubsection1',
+        'section1.subsection1.subsubsection1.subsubsubsection1',
+        'section1.subsection1.subsubsection1.subsubsubsection1.var1',
+        'section1.subsection1.subsubsection2',
+        'section1.subsection1.subsubsection2.var1',
+        'section1.subsection2',
+    ]
+
+
+@pytest.mark.parametrize(
+    'cfg_fixture,golden',
+    [('valid_cfg_template', 'valid.dump.golden'), ('updates_cfg', 'updates.dump.golden')],
+)
+def test_write_read_cycle(cfg_fixture, golden, request, update_goldens, testdata):
+    """Test dumping against a golden file, and parsing it back"""
+    cfg_ = request.getfixturevalue(cfg_fixture)
+    golden_path = testdata / golden
+    txt = dump_config(cfg_)
+    if update_goldens:
+        golden_path.write_text(txt, encoding='utf-8')
+    assert txt == golden_path.read_text(encoding='utf-8')
+    assert parse_config(golden_path, encoding='utf-8') == cfg_